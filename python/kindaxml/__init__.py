@@ -10,7 +10,7 @@ common tags and applies sane recovery; pass a `ParserConfig` to customize:
     cfg.set_unknown_mode("strip")
     result = parse("We shipped <cite id=1>last week</cite>.", cfg)
 
-The module exports native classes: Annotation, Segment, Marker, ParseResult, ParserConfig.
+The module exports native classes: Annotation, Attrs, Segment, Marker, ParseResult, ParserConfig.
 """
 
 from __future__ import annotations
@@ -20,20 +20,23 @@ from typing import TypeAlias
 from . import _kindaxml_rs as _native
 
 Annotation: TypeAlias = _native.Annotation
+Attrs: TypeAlias = _native.Attrs
 Segment: TypeAlias = _native.Segment
 Marker: TypeAlias = _native.Marker
 ParseResult: TypeAlias = _native.ParseResult
 parse = _native.parse
+parse_many = _native.parse_many
+render_popup_html = _native.render_popup_html
 ParserConfig: TypeAlias = _native.ParserConfig
 
 __all__ = [
     "parse",
+    "parse_many",
+    "render_popup_html",
     "Annotation",
+    "Attrs",
     "Segment",
     "Marker",
     "ParseResult",
     "ParserConfig",
-    "default_llm_friendly",
-    "retro_citations_forward_notes",
-    "forward_only",
 ]
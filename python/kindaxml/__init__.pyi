@@ -1,14 +1,39 @@
 from __future__ import annotations
 
-from typing import Dict, List, Literal, Self, Union
+from collections.abc import Mapping
+from typing import Iterator, List, Literal, Self, TypeVar, Union, overload
 
 AttrValue = Union[bool, str]
+T = TypeVar("T")
+
+class Attrs(Mapping[str, AttrValue]):
+    """Read-only mapping view over an annotation's attributes."""
+
+    def __getitem__(self, key: str) -> AttrValue: ...
+    def __len__(self) -> int: ...
+    def __contains__(self, key: object) -> bool: ...
+    def __iter__(self) -> Iterator[str]: ...
+    @overload
+    def get(self, key: str) -> AttrValue | None: ...
+    @overload
+    def get(self, key: str, default: T) -> AttrValue | T: ...
+    def get_str(self, key: str) -> str | None: ...
+    """Return the value of `key` if it is a string attribute, else None."""
+    def is_flag(self, key: str) -> bool: ...
+    """Return True if `key` is a set boolean attribute (e.g. `<todo urgent>`)."""
+    # These return lists rather than mapping views.
+    def keys(self) -> List[str]: ...  # type: ignore[override]
+    def values(self) -> List[AttrValue]: ...  # type: ignore[override]
+    def items(self) -> List[tuple[str, AttrValue]]: ...  # type: ignore[override]
+    def __eq__(self, other: object) -> bool: ...
+    """Compare equal to any mapping with the same items, like `dict`."""
+    def __repr__(self) -> str: ...
 
 class Annotation:
     """Annotation attached to a span."""
 
     tag: str
-    attrs: Dict[str, AttrValue]
+    attrs: Attrs
     def __repr__(self) -> str: ...
     """Return a readable representation."""
 
@@ -34,6 +59,8 @@ class ParseResult:
     text: str
     segments: List[Segment]
     markers: List[Marker]
+    marker_positions: List[int]
+    marker_annotations: List[Annotation]
     def __repr__(self) -> str: ...
     """Return a readable summary with counts."""
 
@@ -74,4 +101,33 @@ def parse(text: str, config: ParserConfig | None = None) -> ParseResult: ...
 
 """Parse KindaXML text using the default configuration."""
 
-__all__ = ["parse", "Annotation", "Segment", "Marker", "ParseResult"]
+def parse_many(
+    texts: list[str], config: ParserConfig | None = None
+) -> list[ParseResult]: ...
+
+"""Parse a list of texts with one config, releasing the GIL for the whole batch."""
+
+def render_popup_html(
+    result: ParseResult,
+    span_class: str = "hl-pop",
+    popup_attr: str = "data-pop",
+    marker_text: str = "_",
+    marker_suffix: str = " (empty marker)",
+) -> str: ...
+
+"""Render a ParseResult as HTML spans, listing annotations in a popup attribute.
+
+Raises ValueError if `popup_attr` is not a valid HTML attribute name.
+"""
+
+__all__ = [
+    "parse",
+    "parse_many",
+    "render_popup_html",
+    "Annotation",
+    "Attrs",
+    "Segment",
+    "Marker",
+    "ParseResult",
+    "ParserConfig",
+]
@@ -1,12 +1,15 @@
 from mkdocs.plugins import BasePlugin
 from mkdocs.config import config_options
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import kindaxml
 
+# Config shown for examples that do not set their own parser_config.
+DEFAULT_CONFIG = kindaxml.ParserConfig.default_cite_config()
 
-@dataclass
+
+@dataclass(slots=True)
 class DocExample:
     title: str
     description: str
@@ -14,82 +17,17 @@ class DocExample:
     explanation: str
     parser_config_explanation: str = "default"
     parser_config: kindaxml.ParserConfig | None = None
+    # Printable form of the parser config, computed once per example.
+    parser_config_text: str = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        config = DEFAULT_CONFIG if self.parser_config is None else self.parser_config
+        self.parser_config_text = str(config)
 
     def get_output(self) -> str:
         """Render the input text using KindaXML and return HTML output."""
         result = kindaxml.parse(self.input_text, self.parser_config)
-
-        # Ensure markers are sorted by absolute position for stable processing
-        markers = sorted(result.markers, key=lambda m: m.pos)
-
-        rendered = ""
-        seg_start = 0
-        m_i = 0  # pointer into markers list
-
-        for segment in result.segments:
-            seg_text0 = segment.text
-            seg_end = seg_start + len(seg_text0)
-
-            # Build popup text for the segment (unchanged logic)
-            popup_text: list[str] = []
-            if segment.annotations:
-                for ann in segment.annotations:
-                    attrs = [f"{k}={v!r}" for k, v in ann.attrs.items()]
-                    popup_text.append(f"{ann.tag} [{', '.join(attrs)}]")
-
-            # Collect markers that fall within this segment (in global coords)
-            hits: list[tuple[int, str]] = []
-            while m_i < len(markers) and markers[m_i].pos < seg_end:
-                marker = markers[m_i]
-                if marker.pos >= seg_start:
-                    idx = marker.pos - seg_start  # segment-local insertion index
-
-                    m_attrs = [f"{k}={v!r}" for k, v in marker.annotation.attrs.items()]
-                    ins = (
-                        f"{marker.annotation.tag} [{', '.join(m_attrs)}] (empty marker)"
-                    )
-                    hits.append((idx, DocExample.render_output("_", [ins])))
-                m_i += 1
-
-            # Stable insertion with a "pieces" builder (no shifting indices)
-            if not hits:
-                seg_text = seg_text0
-            else:
-                # hits are already in ascending idx because markers are sorted,
-                # but sort again to be safe if positions can tie or reorder.
-                hits.sort(key=lambda x: x[0])
-
-                out_parts: list[str] = []
-                cur = 0
-                for idx, ins in hits:
-                    # Clamp idx just in case (defensive)
-                    if idx < cur:
-                        idx = cur
-                    if idx > len(seg_text0):
-                        idx = len(seg_text0)
-
-                    out_parts.append(seg_text0[cur:idx])
-                    out_parts.append(ins)
-                    cur = idx
-                out_parts.append(seg_text0[cur:])
-                seg_text = "".join(out_parts)
-
-            rendered += self.render_output(seg_text, popup_text)
-
-            # advance position using ORIGINAL segment text length
-            seg_start = seg_end
-
-        return rendered
-
-    @classmethod
-    def render_output(cls, text: str, popup_content: list[str]) -> str:
-        """Render a text segment with optional popup content."""
-        data_pop = ""
-        if popup_content:
-            data_pop = 'class="hl-pop" data-pop="{}"'.format(
-                "&#10;".join(popup_content)
-            )
-        return f"""<span {data_pop}>{text}</span>"""
+        return kindaxml.render_popup_html(result)
 
 
 examples = [
@@ -152,10 +90,10 @@ class TransformPlugin(BasePlugin):
         out_path = Path(config["docs_dir"]) / out_rel
         out_path.parent.mkdir(parents=True, exist_ok=True)
 
-        output = ""
-        for example in examples:
-            output += render_example(example)
-        out_path.write_text(output, encoding="utf-8")
+        # Stream each example to the file instead of holding the whole page in memory.
+        with out_path.open("w", encoding="utf-8", buffering=1 << 20) as fh:
+            for example in examples:
+                fh.write(render_example(example))
 
 
 def render_example(example: DocExample) -> str:
@@ -163,34 +101,40 @@ def render_example(example: DocExample) -> str:
     input_html = Html.p(f"\n```xml\n{example.input_text}\n```\n")
     output_html = Html.p(example.get_output())
 
-    body = example.description
-    parser_setting = ""
-    parser_setting += f"*{example.parser_config_explanation}*, aka: "
-    if example.parser_config is None:
-        config = kindaxml.ParserConfig.default_cite_config()
-    else:
-        config = example.parser_config
-    parser_setting += f"\n```python\n{config}\n```\n"
-    body += f"\n\n**Parse settings**: {parser_setting}\n\n"
-    content_prefix = f"## {example.title}\n" + body
-    content_suffix = (
-        Html.p("") + "**Technical detail:** " + example.explanation + "\n\n"
-    )
-
     two_col = Html.two_col(
         "Input",
         input_html,
         "Rendered Output",
         output_html,
     )
-    return content_prefix + two_col + content_suffix
+    parts = [
+        f"## {example.title}\n",
+        example.description,
+        "\n\n**Parse settings**: ",
+        f"*{example.parser_config_explanation}*, aka: ",
+        f"\n```python\n{example.parser_config_text}\n```\n",
+        "\n\n",
+        two_col,
+        Html.p(""),
+        "**Technical detail:** ",
+        example.explanation,
+        "\n\n",
+    ]
+    return "".join(parts)
+
+
+_TAG = "<{0}>{1}</{0}>".format
+_TAG_WITH_CLASS = '<{0} class="{2}">{1}</{0}>'.format
+_PANEL = '<div class="panel"><h4>{0}</h4><p>{1}</p></div>'.format
+_TWO_COL = '<div class="two-col">{0}{1}</div>'.format
 
 
 class Html:
     @classmethod
     def t(cls, tag: str, content: str, class_name: str | None = None) -> str:
-        cls_attr = f' class="{class_name}"' if class_name else ""
-        return f"<{tag}{cls_attr}>{content}</{tag}>"
+        if class_name:
+            return _TAG_WITH_CLASS(tag, content, class_name)
+        return _TAG(tag, content)
 
     @classmethod
     def p(cls, content: str, class_name: str | None = None) -> str:
@@ -202,7 +146,7 @@ class Html:
 
     @classmethod
     def panel(cls, title: str, body: str) -> str:
-        return Html.div(cls.t("h4", title) + cls.t("p", body), "panel")
+        return _PANEL(title, body)
 
     @classmethod
     def two_col(
@@ -212,6 +156,4 @@ class Html:
         right_title: str,
         right_body: str,
     ) -> str:
-        left_panel = cls.panel(left_title, left_body)
-        right_panel = cls.panel(right_title, right_body)
-        return cls.div(left_panel + right_panel, "two-col")
+        return _TWO_COL(_PANEL(left_title, left_body), _PANEL(right_title, right_body))
@@ -2,6 +2,11 @@ from __future__ import annotations
 
 import pathlib
 import sys
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
 
 PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[2]
 PYTHON_SRC = PROJECT_ROOT / "python"
@@ -10,11 +15,14 @@ sys.path.insert(0, str(PYTHON_SRC))
 
 from kindaxml import (  # noqa: E402
     Annotation,
+    Attrs,
     Marker,
     ParserConfig,
     ParseResult,
     Segment,
     parse,
+    parse_many,
+    render_popup_html,
 )
 
 
@@ -37,6 +45,53 @@ def test_parse_markers() -> None:
     assert res.markers[0].annotation.tag == "todo"
     assert res.markers[0].annotation.attrs["id"] == "3"
     assert "Marker" in repr(res.markers[0])
+    assert res.marker_positions == [m.pos for m in res.markers]
+    assert [a.tag for a in res.marker_annotations] == ["todo"]
+
+
+def test_attrs_mapping_view() -> None:
+    res = parse("<todo id=3 urgent>Fix it</todo>")
+    attrs = res.segments[0].annotations[0].attrs
+    assert isinstance(attrs, Attrs)
+    assert len(attrs) == 2
+    assert "id" in attrs and "missing" not in attrs
+    assert attrs["urgent"] is True
+    assert attrs.get("missing") is None
+    assert attrs.get("missing", "x") == "x"
+    assert sorted(attrs) == ["id", "urgent"]
+    assert dict(attrs.items()) == {"id": "3", "urgent": True}
+    assert dict(attrs) == {"id": "3", "urgent": True}
+    assert attrs.get_str("id") == "3"
+    assert attrs.get_str("urgent") is None
+    assert attrs.is_flag("urgent") and not attrs.is_flag("id")
+    assert not attrs.is_flag("missing")
+
+
+def test_attrs_compares_like_a_mapping() -> None:
+    res = parse("<todo id=3 urgent>Fix it</todo> <todo id=3 urgent>again</todo>")
+    attrs = res.segments[0].annotations[0].attrs
+    assert isinstance(attrs, Mapping)
+    assert attrs == {"id": "3", "urgent": True}
+    assert {"id": "3", "urgent": True} == attrs
+    assert attrs == res.segments[2].annotations[0].attrs
+    assert attrs != {"id": "3"}
+    assert attrs != {"id": "4", "urgent": True}
+    assert attrs != {"id": "3", "flag": True}
+    assert attrs != ["id", "urgent"]
+
+
+def test_attrs_non_str_keys_are_missing() -> None:
+    attrs = parse("<todo id=3 urgent>Fix it</todo>").segments[0].annotations[0].attrs
+    assert 1 not in attrs
+    assert attrs.get(1) is None
+    assert attrs.get(1, "x") == "x"
+    with pytest.raises(KeyError):
+        attrs[1]
+
+
+def test_attrs_repr_matches_dict() -> None:
+    attrs = parse("<todo id=3 urgent>Fix it</todo>").segments[0].annotations[0].attrs
+    assert repr(attrs) == repr(dict(attrs))
 
 
 def test_forward_until_tag_default_config() -> None:
@@ -45,6 +100,27 @@ def test_forward_until_tag_default_config() -> None:
     assert res.segments[2].annotations[0].attrs["level"] == "low"
 
 
+def test_untouched_text_reuses_input() -> None:
+    text = "no markup " * 10
+    assert parse(text).text is text
+    assert parse("<cite id=1>a</cite>").text == "a"
+
+    class MyStr(str):
+        pass
+
+    sub = parse(MyStr(text)).text
+    assert sub == text and type(sub) is str
+
+
+def test_repeated_tags_share_one_str_per_parse() -> None:
+    res = parse("<cite id=1>A</cite> <cite id=2>B</cite> <Cite id=3>C</Cite><cite/>")
+    first, second, third = (seg.annotations[0] for seg in res.segments if seg.annotations)
+    assert (first.tag, second.tag, third.tag) == ("cite", "cite", "Cite")
+    assert first.tag is second.tag
+    assert first.tag is res.markers[0].annotation.tag
+    assert first.tag is res.marker_annotations[0].tag
+
+
 def test_unknown_tags_are_stripped() -> None:
     res = parse("Hello <unknown>world</unknown>")
     assert res.text == "Hello world"
@@ -67,6 +143,42 @@ def test_custom_config_passthrough() -> None:
     assert res.segments[-1].annotations[0].tag == "note"
 
 
+def test_config_changes_apply_after_parse() -> None:
+    cfg = ParserConfig().with_recognized_tags(["note"])
+    assert parse("<note>a</note>", cfg).segments[0].annotations[0].tag == "note"
+    cfg.with_recognized_tags(["cite"])
+    assert parse("<note>a</note>", cfg).segments[0].annotations == []
+
+
+def test_config_mutation_during_threaded_parse() -> None:
+    # Inputs of at least 4 KiB release the GIL while parsing.
+    cfg = ParserConfig().with_recognized_tags(["note", "todo"])
+    text = "Item <note id=1>shipped</note> then <todo/> more. " * 200
+    assert len(text) >= 4096
+
+    def summary(res: ParseResult) -> list[tuple[str, list[str]]]:
+        return [(s.text, [a.tag for a in s.annotations]) for s in res.segments]
+
+    expected = summary(parse(text, cfg))
+    stop = threading.Event()
+
+    def mutate() -> None:
+        while not stop.is_set():
+            cfg.with_trim_punctuation(True)
+
+    mutator = threading.Thread(target=mutate)
+    mutator.start()
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: parse(text, cfg), range(32)))
+            batches = list(pool.map(lambda _: parse_many([text, text], cfg), range(8)))
+    finally:
+        stop.set()
+        mutator.join()
+    assert all(summary(r) == expected for r in results)
+    assert all(summary(r) == expected for batch in batches for r in batch)
+
+
 def test_self_closing_tags() -> None:
     cfg = ParserConfig().with_recognized_tags(["todo"])
     res = parse("This is<todo id=8/> my todo", cfg)
@@ -75,3 +187,29 @@ def test_self_closing_tags() -> None:
     assert res.markers[0].annotation.tag == "todo"
     assert res.segments[0].text == "This is my todo"
     assert res.segments[0].annotations == []
+
+
+def test_parse_many_matches_parse() -> None:
+    cfg = ParserConfig().with_recognized_tags(["note"])
+    texts = ["<note>a</note>", "plain", "x <note>b"]
+    results = parse_many(texts, cfg)
+    assert [r.text for r in results] == [parse(t, cfg).text for t in texts]
+    assert results[2].segments[1].annotations[0].tag == "note"
+    assert parse_many([]) == []
+
+
+def test_render_popup_html() -> None:
+    cfg = ParserConfig().with_recognized_tags(["cite", "todo"])
+    res = parse("We <cite id=1>did</cite> it<todo/>.", cfg)
+    assert render_popup_html(res) == (
+        "<span>We </span>"
+        '<span class="hl-pop" data-pop="cite [id=\'1\']">did</span>'
+        '<span> it<span class="hl-pop" data-pop="todo [] (empty marker)">_</span>.</span>'
+    )
+    marker = '<span class="hl-pop" data-pop="todo [] (empty marker)">_</span>'
+    assert render_popup_html(parse("Done<todo/>", cfg)) == f"<span>Done</span>{marker}"
+    assert render_popup_html(parse("<todo/>", cfg)) == marker
+    assert 'data-x="cite' in render_popup_html(res, popup_attr="data-x")
+    for bad in ["", "x onmouseover=alert(1)", 'a"b', "a>b", "a/b"]:
+        with pytest.raises(ValueError):
+            render_popup_html(res, popup_attr=bad)
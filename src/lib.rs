@@ -17,12 +17,14 @@
 //! See `ParserConfig` for knobs that control recovery and unknown tag handling.
 
 pub mod parser;
+pub mod render;
 pub mod types;
 
 #[cfg(feature = "python")]
 mod python_bindings;
 
-pub use parser::parse;
+pub use parser::{parse, parse_compiled, parse_many, parse_many_compiled};
+pub use render::{PopupHtmlConfig, render_popup_html};
 pub use types::*;
 
 #[cfg(test)]
@@ -204,6 +206,14 @@ mod tests {
         );
     }
 
+    #[test]
+    fn markers_are_in_document_order() {
+        let cfg = base_config();
+        let result = parse("<todo/>a<cite/><note/>b <todo id=2/>", &cfg);
+        let positions: Vec<_> = result.markers.iter().map(|m| m.pos).collect();
+        assert_eq!(positions, vec![0, 1, 1, 3]);
+    }
+
     #[test]
     fn cdata_literal_in_code() {
         let cfg = base_config();
@@ -434,6 +444,105 @@ mod tests {
         assert_eq!(result.text, "Hello </cite>world");
     }
 
+    #[test]
+    fn parse_many_matches_parse_in_order() {
+        let cfg = base_config();
+        // Large enough to take the multi-threaded path.
+        let inputs: Vec<String> = (0..64)
+            .map(|i| format!("Item {i} <cite id={i}>shipped</cite>. ").repeat(200))
+            .collect();
+        let batch = parse_many(&inputs, &cfg);
+        assert_eq!(batch.len(), inputs.len());
+        for (input, result) in inputs.iter().zip(&batch) {
+            assert_eq!(result, &parse(input, &cfg));
+        }
+        assert!(parse_many::<&str>(&[], &cfg).is_empty());
+    }
+
+    #[test]
+    fn compiled_config_applies_normalized_overrides() {
+        let mut cfg = base_config();
+        cfg.per_tag_recovery.remove("note");
+        cfg.per_tag_recovery
+            .insert("NOTE".into(), RecoveryStrategy::ForwardNextToken);
+        let compiled = cfg.compile();
+        assert_eq!(
+            compiled.tag_strategy("note"),
+            Some(&RecoveryStrategy::ForwardNextToken)
+        );
+        assert_eq!(compiled.tag_strategy("weird"), None);
+
+        let result = parse_compiled("<Note>alpha beta", &compiled);
+        assert_eq!(result.text, "alpha beta");
+        assert_eq!(annotated_texts(&result, "Note"), vec!["alpha"]);
+
+        let result = parse_compiled("We shipped <cite id=1>.", &compiled);
+        assert_eq!(result.text, "We shipped .");
+        assert_eq!(annotated_texts(&result, "cite"), vec!["We shipped"]);
+
+        let result = parse_compiled("<weird>x</weird>", &compiled);
+        assert_eq!(result.text, "x");
+        assert!(result.segments.iter().all(|s| s.annotations.is_empty()));
+    }
+
+    #[test]
+    fn render_popup_html_wraps_segments_and_markers() {
+        let cfg = base_config();
+        let result = parse("We <cite id=1>did</cite> a <todo/>& b", &cfg);
+        let html = render_popup_html(&result, &PopupHtmlConfig::default());
+        assert_eq!(
+            html,
+            "<span>We </span>\
+             <span class=\"hl-pop\" data-pop=\"cite [id='1']\">did</span>\
+             <span> a <span class=\"hl-pop\" data-pop=\"todo [] (empty marker)\">_</span>\
+             &amp; b</span>"
+        );
+    }
+
+    #[test]
+    fn render_popup_html_keeps_trailing_markers() {
+        let cfg = base_config();
+        let marker = "<span class=\"hl-pop\" data-pop=\"todo [id='1'] (empty marker)\">_</span>";
+
+        let result = parse("Done<todo id=1/>", &cfg);
+        let html = render_popup_html(&result, &PopupHtmlConfig::default());
+        assert_eq!(html, format!("<span>Done</span>{marker}"));
+
+        let result = parse("<todo id=1/>", &cfg);
+        let html = render_popup_html(&result, &PopupHtmlConfig::default());
+        assert_eq!(html, marker);
+    }
+
+    #[test]
+    #[should_panic(expected = "invalid HTML attribute name")]
+    fn render_popup_html_rejects_invalid_popup_attr() {
+        let cfg = base_config();
+        let result = parse("<cite id=1>x</cite>", &cfg);
+        let config = PopupHtmlConfig {
+            popup_attr: "x onmouseover=alert(1)".into(),
+            ..PopupHtmlConfig::default()
+        };
+        render_popup_html(&result, &config);
+    }
+
+    #[test]
+    fn render_popup_html_escapes_attr_values() {
+        let cfg = base_config();
+        let result = parse("<note by='a \"b\"'>x</note>", &cfg);
+        let html = render_popup_html(&result, &PopupHtmlConfig::default());
+        assert_eq!(
+            html,
+            "<span class=\"hl-pop\" data-pop=\"note [by='a &quot;b&quot;']\">x</span>"
+        );
+
+        let result = parse("<note by=\"it's\">y</note>", &cfg);
+        let html = render_popup_html(&result, &PopupHtmlConfig::default());
+        assert_eq!(
+            html,
+            "<span class=\"hl-pop\" data-pop=\"note [by=&quot;it's&quot;]\">y</span>"
+        );
+    }
+
     #[test]
     fn retro_line_without_trim_keeps_punctuation() {
         let mut cfg = base_config();
@@ -1,8 +1,10 @@
-use std::collections::{HashMap, HashSet};
+use std::collections::HashMap;
+
+use memchr::{memchr, memmem, memrchr};
 
 use crate::types::{
-    Annotation, AttrValue, Marker, ParseResult, ParserConfig, RecoveryStrategy, Segment,
-    StrayEndTagPolicy, UnknownMode,
+    Annotation, AttrValue, CompiledConfig, Marker, ParseResult, ParserConfig, RecoveryStrategy,
+    Segment, StrayEndTagPolicy, UnknownMode,
 };
 
 #[derive(Debug, Clone, PartialEq, Eq)]
@@ -32,16 +34,65 @@ struct OpenTag {
 }
 
 pub fn parse(input: &str, config: &ParserConfig) -> ParseResult {
+    parse_compiled(input, &config.compile())
+}
+
+/// Parse with a precompiled config, skipping per-call config preprocessing.
+pub fn parse_compiled(input: &str, config: &CompiledConfig) -> ParseResult {
     let mut parser = Parser::new(input, config);
     parser.run();
     parser.finish()
 }
 
+/// Total input size below which `parse_many` stays on the calling thread.
+const PARALLEL_MIN_BYTES: usize = 64 * 1024;
+
+/// Parse several inputs with the same config, returning results in input order.
+///
+/// Large batches are split across scoped threads (one chunk per available core).
+pub fn parse_many<S: AsRef<str> + Sync>(inputs: &[S], config: &ParserConfig) -> Vec<ParseResult> {
+    parse_many_compiled(inputs, &config.compile())
+}
+
+/// Like [`parse_many`], with a precompiled config.
+pub fn parse_many_compiled<S: AsRef<str> + Sync>(
+    inputs: &[S],
+    config: &CompiledConfig,
+) -> Vec<ParseResult> {
+    let threads = std::thread::available_parallelism()
+        .map_or(1, |n| n.get())
+        .min(inputs.len());
+    let total: usize = inputs.iter().map(|s| s.as_ref().len()).sum();
+    if threads <= 1 || total < PARALLEL_MIN_BYTES {
+        return inputs
+            .iter()
+            .map(|s| parse_compiled(s.as_ref(), config))
+            .collect();
+    }
+
+    let chunk_len = inputs.len().div_ceil(threads);
+    std::thread::scope(|scope| {
+        let handles: Vec<_> = inputs
+            .chunks(chunk_len)
+            .map(|chunk| {
+                scope.spawn(move || {
+                    chunk
+                        .iter()
+                        .map(|s| parse_compiled(s.as_ref(), config))
+                        .collect::<Vec<_>>()
+                })
+            })
+            .collect();
+        handles
+            .into_iter()
+            .flat_map(|h| h.join().unwrap_or_else(|e| std::panic::resume_unwind(e)))
+            .collect()
+    })
+}
+
 struct Parser<'a> {
     input: &'a str,
-    config: &'a ParserConfig,
-    recognized: HashSet<String>,
-    per_tag_recovery: HashMap<String, RecoveryStrategy>,
+    config: &'a CompiledConfig,
     text: String,
     markers: Vec<Marker>,
     spans: Vec<(usize, usize, Annotation)>,
@@ -50,32 +101,10 @@ struct Parser<'a> {
 }
 
 impl<'a> Parser<'a> {
-    fn new(input: &'a str, config: &'a ParserConfig) -> Self {
-        let recognized = if config.case_sensitive_tags {
-            config.recognized_tags.clone()
-        } else {
-            config
-                .recognized_tags
-                .iter()
-                .map(|t| t.to_ascii_lowercase())
-                .collect()
-        };
-
-        let per_tag_recovery = if config.case_sensitive_tags {
-            config.per_tag_recovery.clone()
-        } else {
-            config
-                .per_tag_recovery
-                .iter()
-                .map(|(k, v)| (k.to_ascii_lowercase(), v.clone()))
-                .collect()
-        };
-
+    fn new(input: &'a str, config: &'a CompiledConfig) -> Self {
         Self {
             input,
             config,
-            recognized,
-            per_tag_recovery,
             text: String::new(),
             markers: Vec::new(),
             spans: Vec::new(),
@@ -103,7 +132,7 @@ impl<'a> Parser<'a> {
 
             if remaining.starts_with("<![CDATA[") {
                 let cdata_start = idx + "<![CDATA[".len();
-                if let Some(end) = self.input[cdata_start..].find("]]>") {
+                if let Some(end) = memmem::find(&self.input.as_bytes()[cdata_start..], b"]]>") {
                     let literal_end = cdata_start + end;
                     let literal = &self.input[cdata_start..literal_end];
                     self.push_text(literal);
@@ -154,7 +183,7 @@ impl<'a> Parser<'a> {
                 }
             }
 
-            if let Some(next_lt) = remaining.find('<') {
+            if let Some(next_lt) = memchr(b'<', remaining.as_bytes()) {
                 let slice = &remaining[..next_lt];
                 self.push_text(slice);
                 idx += slice.len();
@@ -167,26 +196,9 @@ impl<'a> Parser<'a> {
 
     fn parse_tag(&self, start: usize) -> Option<(TagToken, usize)> {
         let remaining = &self.input[start..];
-        let mut in_quote: Option<char> = None;
-        let mut end_offset: Option<usize> = None;
-        for (i, ch) in remaining.char_indices() {
-            match ch {
-                '\'' | '"' => {
-                    if in_quote == Some(ch) {
-                        in_quote = None;
-                    } else if in_quote.is_none() {
-                        in_quote = Some(ch);
-                    }
-                }
-                '>' => {
-                    end_offset = Some(i);
-                    break;
-                }
-                _ => {}
-            }
-        }
-
-        let end_offset = end_offset?;
+        // A tag always ends at the first '>', even inside quotes; broken quotes
+        // are recovered in `parse_attrs` instead.
+        let end_offset = memchr(b'>', remaining.as_bytes())?;
         let raw = &remaining[..=end_offset];
         if raw.len() < 3 {
             return None;
@@ -260,8 +272,8 @@ impl<'a> Parser<'a> {
         }
 
         let strategy = self
-            .per_tag_recovery
-            .get(&token.normalized_name)
+            .config
+            .tag_strategy(&token.normalized_name)
             .cloned()
             .unwrap_or(RecoveryStrategy::RetroLine);
 
@@ -487,16 +499,14 @@ impl<'a> Parser<'a> {
     }
 
     fn push_text(&mut self, text: &str) {
-        for (i, ch) in text.char_indices() {
-            if ch == '\n' {
-                self.line_start = self.text.len() + i + ch.len_utf8();
-            }
+        if let Some(i) = memrchr(b'\n', text.as_bytes()) {
+            self.line_start = self.text.len() + i + 1;
         }
         self.text.push_str(text);
     }
 
     fn is_recognized(&self, name: &str) -> bool {
-        self.recognized.contains(name)
+        self.config.tag_strategy(name).is_some()
     }
 
     fn should_treat_as_text(&self, token: &TagToken) -> bool {
@@ -529,15 +539,7 @@ fn parse_name_and_rest(input: &str) -> Option<(String, &str)> {
         return None;
     }
 
-    let mut end_idx = 0;
-    for (idx, ch) in input.char_indices() {
-        if is_name_continue(ch) {
-            end_idx = idx + ch.len_utf8();
-        } else {
-            break;
-        }
-    }
-
+    let end_idx = name_len(input);
     let name = input[..end_idx].to_string();
     let rest = &input[end_idx..];
     Some((name, rest))
@@ -553,19 +555,11 @@ fn parse_attrs(mut input: &str) -> HashMap<String, AttrValue> {
         let consumed_ws = input.len() - trimmed.len();
         input = &input[consumed_ws..];
 
-        let mut name = String::new();
-        let mut idx = 0;
-        for ch in input.chars() {
-            if is_name_continue(ch) {
-                name.push(ch);
-                idx += ch.len_utf8();
-            } else {
-                break;
-            }
-        }
-        if name.is_empty() {
+        let idx = name_len(input);
+        if idx == 0 {
             break;
         }
+        let name = input[..idx].to_string();
         input = &input[idx..];
 
         let mut after_eq = input.trim_start();
@@ -580,7 +574,7 @@ fn parse_attrs(mut input: &str) -> HashMap<String, AttrValue> {
                 if first == '"' || first == '\'' {
                     let quote = first;
                     input = &input[first.len_utf8()..];
-                    if let Some(pos) = input.find(quote) {
+                    if let Some(pos) = memchr(quote as u8, input.as_bytes()) {
                         let val = &input[..pos];
                         value = AttrValue::Str(val.to_string());
                         input = &input[pos + quote.len_utf8()..];
@@ -590,13 +584,7 @@ fn parse_attrs(mut input: &str) -> HashMap<String, AttrValue> {
                         input = "";
                     }
                 } else {
-                    let mut end = 0;
-                    for (i, ch) in input.char_indices() {
-                        if ch.is_whitespace() || ch == '/' || ch == '>' {
-                            break;
-                        }
-                        end = i + ch.len_utf8();
-                    }
+                    let mut end = unquoted_value_len(input);
                     if end == 0 && !input.is_empty() {
                         end = input.len();
                     }
@@ -636,8 +624,56 @@ fn is_name_start(ch: char) -> bool {
     ch.is_ascii_alphabetic()
 }
 
-fn is_name_continue(ch: char) -> bool {
-    ch.is_ascii_alphanumeric() || matches!(ch, '_' | '-' | ':' | '.')
+const CLASS_NAME: u8 = 1;
+const CLASS_VALUE_END: u8 = 2;
+
+/// Byte classes for the ASCII range used while scanning tag bodies.
+/// Non-ASCII bytes are never name bytes and never end a value on their own.
+static BYTE_CLASS: [u8; 256] = {
+    let mut table = [0u8; 256];
+    let mut i = 0;
+    while i < 128 {
+        let b = i as u8;
+        if b.is_ascii_alphanumeric() || matches!(b, b'_' | b'-' | b':' | b'.') {
+            table[i] |= CLASS_NAME;
+        }
+        // Mirrors `char::is_whitespace` for ASCII, plus the tag delimiters.
+        if matches!(b, b' ' | b'\t' | b'\n' | 0x0B | 0x0C | b'\r' | b'/' | b'>') {
+            table[i] |= CLASS_VALUE_END;
+        }
+        i += 1;
+    }
+    table
+};
+
+/// Length of the leading run of name bytes (`[A-Za-z0-9_:.-]`).
+fn name_len(input: &str) -> usize {
+    input
+        .bytes()
+        .position(|b| BYTE_CLASS[b as usize] & CLASS_NAME == 0)
+        .unwrap_or(input.len())
+}
+
+/// Length of an unquoted attribute value: up to whitespace, '/' or '>'.
+fn unquoted_value_len(input: &str) -> usize {
+    let bytes = input.as_bytes();
+    let mut end = 0;
+    while end < bytes.len() {
+        let b = bytes[end];
+        if b.is_ascii() {
+            if BYTE_CLASS[b as usize] & CLASS_VALUE_END != 0 {
+                break;
+            }
+            end += 1;
+        } else {
+            let ch = input[end..].chars().next().unwrap();
+            if ch.is_whitespace() {
+                break;
+            }
+            end += ch.len_utf8();
+        }
+    }
+    end
 }
 
 fn is_trim_char(ch: char) -> bool {
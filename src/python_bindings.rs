@@ -1,39 +1,43 @@
 #![allow(unsafe_op_in_unsafe_fn)]
 
+use std::cell::OnceCell;
+use std::collections::HashMap;
+use std::sync::{Arc, OnceLock};
+
+use crate::render::is_valid_attr_name;
 use crate::{
-    Annotation, AttrValue, Marker, ParseResult, ParserConfig, RecoveryStrategy, Segment,
-    UnknownMode, parse,
+    Annotation, AttrValue, CompiledConfig, Marker, ParseResult, ParserConfig, PopupHtmlConfig,
+    RecoveryStrategy, Segment, UnknownMode, parse_compiled, parse_many_compiled, render_popup_html,
 };
+use pyo3::exceptions::PyKeyError;
 use pyo3::prelude::*;
-use pyo3::types::PyType;
+use pyo3::pyclass::CompareOp;
+use pyo3::types::{PyDict, PyIterator, PyList, PyMapping, PyString, PyType};
 
 #[pyclass(name = "Annotation")]
 #[derive(Clone)]
 pub struct PyAnnotation {
     inner: Annotation,
+    /// `inner.tag` as a Python str, shared by every annotation of one parse with that tag.
+    tag: Py<PyString>,
 }
 
 #[pymethods]
 impl PyAnnotation {
     #[classattr]
     const __doc__: &'static str =
-        "Annotation(tag: str, attrs: dict[str, bool | str]) -> annotation attached to a span.";
+        "Annotation(tag: str, attrs: Attrs) -> annotation attached to a span.";
 
     #[getter]
-    fn tag(&self) -> &str {
-        &self.inner.tag
+    fn tag<'py>(&self, py: Python<'py>) -> Bound<'py, PyString> {
+        self.tag.bind(py).clone()
     }
 
     #[getter]
-    fn attrs<'py>(&self, py: Python<'py>) -> PyResult<PyObject> {
-        let dict = pyo3::types::PyDict::new_bound(py);
-        for (k, v) in &self.inner.attrs {
-            match v {
-                AttrValue::Bool(b) => dict.set_item(k, *b)?,
-                AttrValue::Str(s) => dict.set_item(k, s)?,
-            }
+    fn attrs(slf: &Bound<'_, Self>) -> PyAttrs {
+        PyAttrs {
+            owner: slf.clone().unbind(),
         }
-        Ok(dict.into_py(py))
     }
 
     fn __repr__(&self) -> PyResult<String> {
@@ -44,10 +48,168 @@ impl PyAnnotation {
     }
 }
 
+fn attr_value_to_py(py: Python<'_>, value: &AttrValue) -> PyObject {
+    match value {
+        AttrValue::Bool(b) => b.into_py(py),
+        AttrValue::Str(s) => s.into_py(py),
+    }
+}
+
+/// Read-only mapping view over an annotation's attributes.
+///
+/// Values are converted on access; no Python dict is built unless requested.
+#[pyclass(name = "Attrs", mapping)]
+pub struct PyAttrs {
+    owner: Py<PyAnnotation>,
+}
+
+#[pymethods]
+impl PyAttrs {
+    #[classattr]
+    const __doc__: &'static str = "Attrs -> read-only mapping of attribute name to bool | str.";
+
+    fn __getitem__(&self, py: Python<'_>, key: &Bound<'_, PyAny>) -> PyResult<PyObject> {
+        let owner = self.owner.borrow(py);
+        lookup(&owner.inner.attrs, key)
+            .map(|v| attr_value_to_py(py, v))
+            .ok_or_else(|| PyKeyError::new_err(key.clone().unbind()))
+    }
+
+    fn __len__(&self, py: Python<'_>) -> usize {
+        self.owner.borrow(py).inner.attrs.len()
+    }
+
+    fn __contains__(&self, py: Python<'_>, key: &Bound<'_, PyAny>) -> bool {
+        lookup(&self.owner.borrow(py).inner.attrs, key).is_some()
+    }
+
+    fn __iter__<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyIterator>> {
+        PyIterator::from_bound_object(self.keys(py).as_any())
+    }
+
+    #[pyo3(signature = (key, default=None))]
+    fn get(&self, py: Python<'_>, key: &Bound<'_, PyAny>, default: Option<PyObject>) -> PyObject {
+        let owner = self.owner.borrow(py);
+        match lookup(&owner.inner.attrs, key) {
+            Some(v) => attr_value_to_py(py, v),
+            None => default.unwrap_or_else(|| py.None()),
+        }
+    }
+
+    /// Return the value of `key` if it is a string attribute, else None.
+    fn get_str(&self, py: Python<'_>, key: &str) -> Option<String> {
+        match self.owner.borrow(py).inner.attrs.get(key) {
+            Some(AttrValue::Str(s)) => Some(s.clone()),
+            _ => None,
+        }
+    }
+
+    /// Return True if `key` is a set boolean attribute (e.g. `<todo urgent>`).
+    fn is_flag(&self, py: Python<'_>, key: &str) -> bool {
+        matches!(
+            self.owner.borrow(py).inner.attrs.get(key),
+            Some(AttrValue::Bool(true))
+        )
+    }
+
+    fn keys<'py>(&self, py: Python<'py>) -> Bound<'py, PyList> {
+        let owner = self.owner.borrow(py);
+        PyList::new_bound(py, owner.inner.attrs.keys())
+    }
+
+    fn values<'py>(&self, py: Python<'py>) -> Bound<'py, PyList> {
+        let owner = self.owner.borrow(py);
+        PyList::new_bound(
+            py,
+            owner.inner.attrs.values().map(|v| attr_value_to_py(py, v)),
+        )
+    }
+
+    fn items<'py>(&self, py: Python<'py>) -> Bound<'py, PyList> {
+        let owner = self.owner.borrow(py);
+        PyList::new_bound(
+            py,
+            owner
+                .inner
+                .attrs
+                .iter()
+                .map(|(k, v)| (k.as_str(), attr_value_to_py(py, v)).into_py(py)),
+        )
+    }
+
+    /// Compare equal to any mapping with the same keys and values, like `dict`.
+    fn __richcmp__(
+        &self,
+        py: Python<'_>,
+        other: &Bound<'_, PyAny>,
+        op: CompareOp,
+    ) -> PyResult<PyObject> {
+        let eq = match op {
+            CompareOp::Eq | CompareOp::Ne => self.eq_mapping(py, other)?,
+            _ => None,
+        };
+        Ok(match eq {
+            Some(eq) => (eq == matches!(op, CompareOp::Eq)).into_py(py),
+            None => py.NotImplemented(),
+        })
+    }
+
+    /// Same as the repr of the equivalent dict.
+    fn __repr__<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyString>> {
+        let owner = self.owner.borrow(py);
+        let dict = PyDict::new_bound(py);
+        for (k, v) in &owner.inner.attrs {
+            dict.set_item(k, attr_value_to_py(py, v))?;
+        }
+        dict.repr()
+    }
+}
+
+/// Look up a Python key; like a dict with str keys, any other key is simply missing.
+fn lookup<'a>(
+    attrs: &'a HashMap<String, AttrValue>,
+    key: &Bound<'_, PyAny>,
+) -> Option<&'a AttrValue> {
+    let key = key.downcast::<PyString>().ok()?.to_str().ok()?;
+    attrs.get(key)
+}
+
+impl PyAttrs {
+    /// Equality against another mapping, or `None` if `other` is not a mapping.
+    fn eq_mapping(&self, py: Python<'_>, other: &Bound<'_, PyAny>) -> PyResult<Option<bool>> {
+        let owner = self.owner.borrow(py);
+        let attrs = &owner.inner.attrs;
+        if let Ok(other) = other.downcast::<PyAttrs>() {
+            let other = other.borrow();
+            let other_owner = other.owner.borrow(py);
+            return Ok(Some(*attrs == other_owner.inner.attrs));
+        }
+        let Ok(other) = other.downcast::<PyMapping>() else {
+            return Ok(None);
+        };
+        if other.len()? != attrs.len() {
+            return Ok(Some(false));
+        }
+        for (k, v) in attrs {
+            let theirs = match other.get_item(k) {
+                Ok(theirs) => theirs,
+                Err(e) if e.is_instance_of::<PyKeyError>(py) => return Ok(Some(false)),
+                Err(e) => return Err(e),
+            };
+            if !theirs.eq(attr_value_to_py(py, v))? {
+                return Ok(Some(false));
+            }
+        }
+        Ok(Some(true))
+    }
+}
+
 #[pyclass(name = "Segment")]
 #[derive(Clone)]
 pub struct PySegment {
     inner: Segment,
+    /// Tag strings parallel to `inner.annotations`.
+    tags: Vec<Py<PyString>>,
 }
 
 #[pymethods]
@@ -66,7 +228,16 @@ impl PySegment {
             .annotations
             .iter()
             .cloned()
-            .map(|a| Py::new(py, PyAnnotation { inner: a }))
+            .zip(&self.tags)
+            .map(|(a, tag)| {
+                Py::new(
+                    py,
+                    PyAnnotation {
+                        inner: a,
+                        tag: tag.clone_ref(py),
+                    },
+                )
+            })
             .collect()
     }
 
@@ -88,6 +259,7 @@ impl PySegment {
 #[derive(Clone)]
 pub struct PyMarker {
     inner: Marker,
+    tag: Py<PyString>,
 }
 
 #[pymethods]
@@ -107,6 +279,7 @@ impl PyMarker {
             py,
             PyAnnotation {
                 inner: self.inner.annotation.clone(),
+                tag: self.tag.clone_ref(py),
             },
         )
     }
@@ -122,6 +295,40 @@ impl PyMarker {
 #[pyclass(name = "ParseResult")]
 pub struct PyParseResult {
     inner: ParseResult,
+    /// The caller's input string, kept when parsing left the text unchanged.
+    text_obj: Option<Py<PyString>>,
+    /// One Python str per distinct tag name in this result.
+    tags: HashMap<String, Py<PyString>>,
+}
+
+impl PyParseResult {
+    /// Wrap a result, reusing `input` as `text` if it is an exact `str` and no markup was removed.
+    fn new(result: ParseResult, input: &Bound<'_, PyString>, source: &str) -> Self {
+        let py = input.py();
+        let text_obj = (input.is_exact_instance_of::<PyString>() && result.text == source)
+            .then(|| input.clone().unbind());
+        let mut tags = HashMap::new();
+        let names = result
+            .segments
+            .iter()
+            .flat_map(|s| &s.annotations)
+            .chain(result.markers.iter().map(|m| &m.annotation))
+            .map(|a| &a.tag);
+        for name in names {
+            if !tags.contains_key(name) {
+                tags.insert(name.clone(), PyString::new_bound(py, name).unbind());
+            }
+        }
+        Self {
+            inner: result,
+            text_obj,
+            tags,
+        }
+    }
+
+    fn tag(&self, py: Python<'_>, name: &str) -> Py<PyString> {
+        self.tags[name].clone_ref(py)
+    }
 }
 
 #[pymethods]
@@ -131,8 +338,11 @@ impl PyParseResult {
         "ParseResult(text: str, segments: list[Segment], markers: list[Marker]).";
 
     #[getter]
-    fn text(&self) -> &str {
-        &self.inner.text
+    fn text<'py>(&self, py: Python<'py>) -> Bound<'py, PyString> {
+        match &self.text_obj {
+            Some(text) => text.bind(py).clone(),
+            None => PyString::new_bound(py, &self.inner.text),
+        }
     }
 
     #[getter]
@@ -141,7 +351,10 @@ impl PyParseResult {
             .segments
             .iter()
             .cloned()
-            .map(|s| Py::new(py, PySegment { inner: s }))
+            .map(|s| {
+                let tags = s.annotations.iter().map(|a| self.tag(py, &a.tag)).collect();
+                Py::new(py, PySegment { inner: s, tags })
+            })
             .collect()
     }
 
@@ -151,7 +364,34 @@ impl PyParseResult {
             .markers
             .iter()
             .cloned()
-            .map(|m| Py::new(py, PyMarker { inner: m }))
+            .map(|m| {
+                let tag = self.tag(py, &m.annotation.tag);
+                Py::new(py, PyMarker { inner: m, tag })
+            })
+            .collect()
+    }
+
+    /// Marker positions in document order, without building Marker objects.
+    #[getter]
+    fn marker_positions(&self) -> Vec<usize> {
+        self.inner.markers.iter().map(|m| m.pos).collect()
+    }
+
+    /// Marker annotations, parallel to `marker_positions`.
+    #[getter]
+    fn marker_annotations<'py>(&self, py: Python<'py>) -> PyResult<Vec<Py<PyAnnotation>>> {
+        self.inner
+            .markers
+            .iter()
+            .map(|m| {
+                Py::new(
+                    py,
+                    PyAnnotation {
+                        inner: m.annotation.clone(),
+                        tag: self.tag(py, &m.annotation.tag),
+                    },
+                )
+            })
             .collect()
     }
 
@@ -168,6 +408,28 @@ impl PyParseResult {
 #[pyclass(name = "ParserConfig")]
 pub struct PyParserConfig {
     inner: ParserConfig,
+    /// Compiled form of `inner`, built on first parse and dropped on any change.
+    compiled: OnceCell<Arc<CompiledConfig>>,
+}
+
+impl PyParserConfig {
+    fn from_config(inner: ParserConfig) -> Self {
+        Self {
+            inner,
+            compiled: OnceCell::new(),
+        }
+    }
+
+    fn compiled(&self) -> Arc<CompiledConfig> {
+        self.compiled
+            .get_or_init(|| Arc::new(self.inner.compile()))
+            .clone()
+    }
+
+    fn config_mut(&mut self) -> &mut ParserConfig {
+        self.compiled.take();
+        &mut self.inner
+    }
 }
 
 #[pymethods]
@@ -177,23 +439,17 @@ impl PyParserConfig {
 
     #[new]
     pub fn new() -> Self {
-        Self {
-            inner: ParserConfig::default(),
-        }
+        Self::from_config(ParserConfig::default())
     }
 
     #[classmethod]
     pub fn default_llm_friendly_config(_cls: &Bound<'_, PyType>) -> Self {
-        Self {
-            inner: ParserConfig::default_llm_friendly_config(),
-        }
+        Self::from_config(ParserConfig::default_llm_friendly_config())
     }
 
     #[classmethod]
     pub fn default_cite_config(_cls: &Bound<'_, PyType>) -> Self {
-        Self {
-            inner: ParserConfig::default_cite_config(),
-        }
+        Self::from_config(ParserConfig::default_cite_config())
     }
 
     /// Replace the recognized tag set.
@@ -201,7 +457,7 @@ impl PyParserConfig {
         mut slf: PyRefMut<'a, Self>,
         tags: Vec<String>,
     ) -> PyRefMut<'a, Self> {
-        slf.inner.recognized_tags = tags.into_iter().collect();
+        slf.config_mut().recognized_tags = tags.into_iter().collect();
         slf
     }
 
@@ -210,7 +466,7 @@ impl PyParserConfig {
         mut slf: PyRefMut<'a, Self>,
         mode: &str,
     ) -> PyResult<PyRefMut<'a, Self>> {
-        slf.inner.unknown_mode = match mode.to_ascii_lowercase().as_str() {
+        slf.config_mut().unknown_mode = match mode.to_ascii_lowercase().as_str() {
             "strip" => UnknownMode::Strip,
             "passthrough" => UnknownMode::Passthrough,
             "treat_as_text" => UnknownMode::TreatAsText,
@@ -243,15 +499,17 @@ impl PyParserConfig {
                 )));
             }
         };
-        slf.inner.per_tag_recovery.insert(tag.to_string(), strat);
+        slf.config_mut()
+            .per_tag_recovery
+            .insert(tag.to_string(), strat);
         // if the tag is not recognized yet, add it
-        slf.inner.recognized_tags.insert(tag.to_string());
+        slf.config_mut().recognized_tags.insert(tag.to_string());
         Ok(slf)
     }
 
     /// Toggle punctuation trimming for retro spans.
     pub fn with_trim_punctuation<'a>(mut slf: PyRefMut<'a, Self>, val: bool) -> PyRefMut<'a, Self> {
-        slf.inner.trim_punctuation = val;
+        slf.config_mut().trim_punctuation = val;
         slf
     }
 
@@ -260,7 +518,7 @@ impl PyParserConfig {
         mut slf: PyRefMut<'a, Self>,
         val: bool,
     ) -> PyRefMut<'a, Self> {
-        slf.inner.autoclose_on_any_tag = val;
+        slf.config_mut().autoclose_on_any_tag = val;
         slf
     }
 
@@ -269,7 +527,7 @@ impl PyParserConfig {
         mut slf: PyRefMut<'a, Self>,
         val: bool,
     ) -> PyRefMut<'a, Self> {
-        slf.inner.autoclose_on_same_tag = val;
+        slf.config_mut().autoclose_on_same_tag = val;
         slf
     }
 
@@ -278,7 +536,7 @@ impl PyParserConfig {
         mut slf: PyRefMut<'a, Self>,
         val: bool,
     ) -> PyRefMut<'a, Self> {
-        slf.inner.case_sensitive_tags = val;
+        slf.config_mut().case_sensitive_tags = val;
         slf
     }
 
@@ -341,29 +599,99 @@ impl PyParserConfig {
     }
 }
 
+/// Inputs at least this many bytes long are parsed with the GIL released;
+/// below that, releasing and re-acquiring it costs more than it saves.
+const RELEASE_GIL_MIN_LEN: usize = 4 * 1024;
+
 #[pyfunction(name = "parse")]
 #[pyo3(text_signature = "(text, config=None)")]
 /// Parse KindaXML text using the default config (case-insensitive tags, cite retro, others forward).
 pub fn py_parse(
     py: Python<'_>,
-    input: &str,
-    config: Option<&PyParserConfig>,
+    input: &Bound<'_, PyString>,
+    config: Option<Bound<'_, PyParserConfig>>,
 ) -> PyResult<PyObject> {
-    let cfg = config
-        .map(|c| c.inner.clone())
-        .unwrap_or_else(ParserConfig::default_llm_friendly_config);
-    let result = parse(input, &cfg);
-    Py::new(py, PyParseResult { inner: result }).map(|obj| obj.into_py(py))
+    let cfg = resolve_config(config.as_ref());
+    let text = input.to_str()?;
+    let result = if text.len() >= RELEASE_GIL_MIN_LEN {
+        // `text` borrows the caller's str argument, which stays alive for the call.
+        py.allow_threads(|| parse_compiled(text, &cfg))
+    } else {
+        parse_compiled(text, &cfg)
+    };
+    Py::new(py, PyParseResult::new(result, input, text)).map(|obj| obj.into_py(py))
+}
+
+#[pyfunction(name = "parse_many")]
+#[pyo3(text_signature = "(texts, config=None)")]
+/// Parse a list of texts with one config, releasing the GIL for the whole batch.
+pub fn py_parse_many(
+    py: Python<'_>,
+    texts: Vec<Bound<'_, PyString>>,
+    config: Option<Bound<'_, PyParserConfig>>,
+) -> PyResult<Vec<Py<PyParseResult>>> {
+    let cfg = resolve_config(config.as_ref());
+    // The strings borrow the caller's str objects held in `texts`, which stay alive for the call.
+    let sources: Vec<&str> = texts.iter().map(|t| t.to_str()).collect::<PyResult<_>>()?;
+    let results = py.allow_threads(|| parse_many_compiled(&sources, &cfg));
+    results
+        .into_iter()
+        .zip(texts.iter().zip(&sources))
+        .map(|(r, (input, source))| Py::new(py, PyParseResult::new(r, input, source)))
+        .collect()
+}
+
+/// Snapshot the compiled config. The `ParserConfig` is only borrowed while the
+/// `Arc` is cloned, so other threads can keep calling its `with_*` methods while
+/// this parse runs with the GIL released.
+fn resolve_config(config: Option<&Bound<'_, PyParserConfig>>) -> Arc<CompiledConfig> {
+    static DEFAULT_CONFIG: OnceLock<Arc<CompiledConfig>> = OnceLock::new();
+    match config {
+        Some(c) => c.borrow().compiled(),
+        None => DEFAULT_CONFIG
+            .get_or_init(|| Arc::new(ParserConfig::default_llm_friendly_config().compile()))
+            .clone(),
+    }
+}
+
+#[pyfunction(name = "render_popup_html")]
+#[pyo3(signature = (result, span_class="hl-pop", popup_attr="data-pop", marker_text="_", marker_suffix=" (empty marker)"))]
+/// Render a ParseResult as HTML spans, listing annotations in a popup attribute.
+pub fn py_render_popup_html(
+    result: PyRef<'_, PyParseResult>,
+    span_class: &str,
+    popup_attr: &str,
+    marker_text: &str,
+    marker_suffix: &str,
+) -> PyResult<String> {
+    if !is_valid_attr_name(popup_attr) {
+        return Err(pyo3::exceptions::PyValueError::new_err(format!(
+            "invalid popup_attr '{}': not an HTML attribute name",
+            popup_attr
+        )));
+    }
+    let cfg = PopupHtmlConfig {
+        span_class: span_class.to_string(),
+        popup_attr: popup_attr.to_string(),
+        marker_text: marker_text.to_string(),
+        marker_suffix: marker_suffix.to_string(),
+    };
+    Ok(render_popup_html(&result.inner, &cfg))
 }
 
 #[pymodule]
 #[pyo3(name = "_kindaxml_rs")]
-pub fn python_module(_py: Python<'_>, m: &Bound<'_, PyModule>) -> PyResult<()> {
+pub fn python_module(py: Python<'_>, m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<PyParseResult>()?;
     m.add_class::<PySegment>()?;
     m.add_class::<PyAnnotation>()?;
+    m.add_class::<PyAttrs>()?;
+    // Make `isinstance(ann.attrs, collections.abc.Mapping)` hold.
+    PyMapping::register::<PyAttrs>(py)?;
     m.add_class::<PyMarker>()?;
     m.add_class::<PyParserConfig>()?;
     m.add_function(wrap_pyfunction!(py_parse, m)?)?;
+    m.add_function(wrap_pyfunction!(py_parse_many, m)?)?;
+    m.add_function(wrap_pyfunction!(py_render_popup_html, m)?)?;
     Ok(())
 }
@@ -0,0 +1,187 @@
+use std::fmt::Write;
+
+use crate::types::{Annotation, AttrValue, Marker, ParseResult};
+
+/// Options for [`render_popup_html`].
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct PopupHtmlConfig {
+    /// Class set on spans that carry a popup.
+    pub span_class: String,
+    /// Attribute that holds the popup text. Must be a valid HTML attribute name.
+    pub popup_attr: String,
+    /// Placeholder text rendered for zero-width markers.
+    pub marker_text: String,
+    /// Suffix appended to a marker's popup line.
+    pub marker_suffix: String,
+}
+
+impl Default for PopupHtmlConfig {
+    fn default() -> Self {
+        Self {
+            span_class: "hl-pop".into(),
+            popup_attr: "data-pop".into(),
+            marker_text: "_".into(),
+            marker_suffix: " (empty marker)".into(),
+        }
+    }
+}
+
+/// Render parsed text as HTML: one `<span>` per segment, with annotations listed
+/// in a popup attribute and markers inserted as placeholder spans at their positions.
+///
+/// # Panics
+///
+/// Panics if `config.popup_attr` is not a valid HTML attribute name, since it is
+/// written into the markup as-is.
+pub fn render_popup_html(result: &ParseResult, config: &PopupHtmlConfig) -> String {
+    assert!(
+        is_valid_attr_name(&config.popup_attr),
+        "invalid HTML attribute name: {:?}",
+        config.popup_attr
+    );
+    let mut out = String::with_capacity(result.text.len() * 2);
+
+    // The parser emits markers in ascending position, so segments and markers
+    // can be walked together in a single merge pass without sorting.
+    debug_assert!(result.markers.windows(2).all(|w| w[0].pos <= w[1].pos));
+    let mut markers = result.markers.iter().peekable();
+    let mut seg_start = 0;
+    for segment in &result.segments {
+        let seg_end = seg_start + segment.text.len();
+
+        open_span(&mut out, config, &segment.annotations, "");
+        let mut cur = 0;
+        while let Some(marker) = markers.next_if(|m| m.pos < seg_end) {
+            let idx = marker.pos - seg_start;
+            escape_text(&mut out, &segment.text[cur..idx]);
+            write_marker(&mut out, config, marker);
+            cur = idx;
+        }
+        escape_text(&mut out, &segment.text[cur..]);
+        out.push_str("</span>");
+
+        seg_start = seg_end;
+    }
+
+    // Markers at the very end of the text (or in empty text) follow the last segment.
+    for marker in markers {
+        write_marker(&mut out, config, marker);
+    }
+
+    out
+}
+
+fn write_marker(out: &mut String, config: &PopupHtmlConfig, marker: &Marker) {
+    open_span(
+        out,
+        config,
+        std::slice::from_ref(&marker.annotation),
+        &config.marker_suffix,
+    );
+    escape_text(out, &config.marker_text);
+    out.push_str("</span>");
+}
+
+fn open_span(out: &mut String, config: &PopupHtmlConfig, annotations: &[Annotation], suffix: &str) {
+    if annotations.is_empty() {
+        out.push_str("<span>");
+        return;
+    }
+    out.push_str("<span class=\"");
+    escape_attr(out, &config.span_class);
+    out.push_str("\" ");
+    out.push_str(&config.popup_attr);
+    out.push_str("=\"");
+    for (i, ann) in annotations.iter().enumerate() {
+        if i > 0 {
+            out.push_str("&#10;");
+        }
+        write_popup_line(out, ann, suffix);
+    }
+    out.push_str("\">");
+}
+
+/// Write `tag [key=value, ...]` as escaped attribute text, with values shown as
+/// Python literals. Writes straight into `out` without a temporary string.
+fn write_popup_line(out: &mut String, ann: &Annotation, suffix: &str) {
+    escape_attr(out, &ann.tag);
+    out.push_str(" [");
+    for (i, (k, v)) in ann.attrs.iter().enumerate() {
+        if i > 0 {
+            out.push_str(", ");
+        }
+        escape_attr(out, k);
+        out.push('=');
+        match v {
+            AttrValue::Bool(true) => out.push_str("True"),
+            AttrValue::Bool(false) => out.push_str("False"),
+            AttrValue::Str(s) => push_py_repr(out, s),
+        }
+    }
+    out.push(']');
+    escape_attr(out, suffix);
+}
+
+/// Append `s` quoted the way Python's `repr()` quotes a `str`, escaped for an attribute.
+fn push_py_repr(out: &mut String, s: &str) {
+    let quote = if s.contains('\'') && !s.contains('"') {
+        '"'
+    } else {
+        '\''
+    };
+    push_attr_char(out, quote);
+    for ch in s.chars() {
+        match ch {
+            '\\' => out.push_str("\\\\"),
+            '\n' => out.push_str("\\n"),
+            '\r' => out.push_str("\\r"),
+            '\t' => out.push_str("\\t"),
+            c if c == quote => {
+                out.push('\\');
+                push_attr_char(out, c);
+            }
+            c if (c as u32) < 0x20 || c as u32 == 0x7f => {
+                let _ = write!(out, "\\x{:02x}", c as u32);
+            }
+            c => push_attr_char(out, c),
+        }
+    }
+    push_attr_char(out, quote);
+}
+
+/// An HTML attribute name: non-empty, without controls, spaces, `"`, `'`, `>`, `/`,
+/// `=` or Unicode noncharacters.
+pub(crate) fn is_valid_attr_name(name: &str) -> bool {
+    !name.is_empty()
+        && name.chars().all(|c| {
+            let nonchar = matches!(c as u32, 0xFDD0..=0xFDEF) || (c as u32) & 0xFFFE == 0xFFFE;
+            !(c.is_control() || nonchar || matches!(c, ' ' | '"' | '\'' | '>' | '/' | '='))
+        })
+}
+
+fn escape_text(out: &mut String, s: &str) {
+    for ch in s.chars() {
+        match ch {
+            '&' => out.push_str("&amp;"),
+            '<' => out.push_str("&lt;"),
+            '>' => out.push_str("&gt;"),
+            c => out.push(c),
+        }
+    }
+}
+
+fn escape_attr(out: &mut String, s: &str) {
+    for ch in s.chars() {
+        push_attr_char(out, ch);
+    }
+}
+
+fn push_attr_char(out: &mut String, ch: char) {
+    match ch {
+        '&' => out.push_str("&amp;"),
+        '<' => out.push_str("&lt;"),
+        '>' => out.push_str("&gt;"),
+        '"' => out.push_str("&quot;"),
+        c => out.push(c),
+    }
+}
@@ -134,10 +134,65 @@ impl ParserConfig {
     }
 }
 
+/// A `ParserConfig` preprocessed for parsing: tag lookups are normalized for
+/// case sensitivity once, and each recognized tag maps to its recovery strategy.
+///
+/// Build one with [`ParserConfig::compile`] and reuse it across parses.
+#[derive(Debug, Clone)]
+pub struct CompiledConfig {
+    tags: HashMap<String, RecoveryStrategy>,
+    pub(crate) unknown_mode: UnknownMode,
+    pub(crate) autoclose_on_any_tag: bool,
+    pub(crate) autoclose_on_same_tag: bool,
+    pub(crate) trim_punctuation: bool,
+    pub(crate) case_sensitive_tags: bool,
+    pub(crate) stray_end_tag_policy: StrayEndTagPolicy,
+}
+
+impl ParserConfig {
+    /// Preprocess this config for repeated parsing.
+    pub fn compile(&self) -> CompiledConfig {
+        let normalize = |name: &str| {
+            if self.case_sensitive_tags {
+                name.to_string()
+            } else {
+                name.to_ascii_lowercase()
+            }
+        };
+        let mut tags: HashMap<String, RecoveryStrategy> = self
+            .recognized_tags
+            .iter()
+            .map(|t| (normalize(t), RecoveryStrategy::RetroLine))
+            .collect();
+        for (name, strategy) in &self.per_tag_recovery {
+            if let Some(slot) = tags.get_mut(normalize(name).as_str()) {
+                *slot = strategy.clone();
+            }
+        }
+        CompiledConfig {
+            tags,
+            unknown_mode: self.unknown_mode.clone(),
+            autoclose_on_any_tag: self.autoclose_on_any_tag,
+            autoclose_on_same_tag: self.autoclose_on_same_tag,
+            trim_punctuation: self.trim_punctuation,
+            case_sensitive_tags: self.case_sensitive_tags,
+            stray_end_tag_policy: self.stray_end_tag_policy.clone(),
+        }
+    }
+}
+
+impl CompiledConfig {
+    /// Recovery strategy for a recognized tag, or `None` if the (normalized) tag is unknown.
+    pub fn tag_strategy(&self, normalized_name: &str) -> Option<&RecoveryStrategy> {
+        self.tags.get(normalized_name)
+    }
+}
+
 /// Parser output: plain text, spans, and markers.
 #[derive(Debug, Clone, PartialEq, Eq)]
 pub struct ParseResult {
     pub text: String,
     pub segments: Vec<Segment>,
+    /// Markers in document order (ascending `pos`).
     pub markers: Vec<Marker>,
 }